@@ -1,7 +1,95 @@
-from dataclasses import make_dataclass
-import itertools
 import random
-import copy
+import sys
+from collections import deque
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _nearby_mines(board, i, j, height, width):
+    """
+    Counts the mines in the 3x3 neighbourhood of (i, j), compiled to
+    native code so the inner loop skips the Python interpreter entirely.
+    """
+    count = 0
+    for di in range(-1, 2):
+        for dj in range(-1, 2):
+            if di == 0 and dj == 0:
+                continue
+            ni = i + di
+            nj = j + dj
+            if 0 <= ni < height and 0 <= nj < width and board[ni, nj]:
+                count += 1
+    return count
+
+
+@njit(cache=True)
+def _popcount64(x):
+    """
+    Counts the set bits in a uint64 word.
+    """
+    count = 0
+    while x:
+        x &= x - np.uint64(1)
+        count += 1
+    return count
+
+
+@njit(cache=True)
+def _propagate_words(cells, counts):
+    """
+    Runs the pairwise subset reduction to a fixpoint over sentences packed
+    into uint64 words, in place. Each subset test and subtraction is a
+    single native AND/ANDN instruction.
+    """
+    n = cells.shape[0]
+    if n < 2:
+        return
+    sizes = np.empty(n, dtype=np.int64)
+    for k in range(n):
+        sizes[k] = _popcount64(cells[k])
+    changed = True
+    while changed:
+        changed = False
+
+        # Visit pairs in ascending size order: a can only be a strict
+        # subset of a strictly larger b, so the size compare rules the
+        # pair out before the mask test. Equal-size partners can sit
+        # between larger ones (and contractions leave the order stale),
+        # so skip the pair rather than stopping the scan
+        order = np.argsort(sizes)
+        for ai in range(n):
+            a = order[ai]
+            ca = cells[a]
+            if ca == 0:
+                continue
+            for bi in range(ai + 1, n):
+                b = order[bi]
+                if sizes[b] <= sizes[a]:
+                    continue
+                cb = cells[b]
+                if cb == 0:
+                    continue
+                if ca & cb == ca:
+                    cells[b] = cb & ~ca
+                    counts[b] -= counts[a]
+                    # a strict subset leaves exactly its own bits removed
+                    sizes[b] -= sizes[a]
+                    changed = True
+
+
+@njit(cache=True)
+def _count_all_neighbors(board):
+    """
+    Returns the neighbour-mine count of every cell as one int8 array.
+    """
+    height, width = board.shape
+    counts = np.zeros((height, width), dtype=np.int8)
+    for i in range(height):
+        for j in range(width):
+            counts[i, j] = _nearby_mines(board, i, j, height, width)
+    return counts
 
 
 class Minesweeper():
@@ -14,23 +102,21 @@ class Minesweeper():
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
         # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
-
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        # A boolean array keeps the whole board in one contiguous block
+        # instead of height*width separate Python objects
+        self.board = np.zeros((height, width), dtype=np.bool_)
+
+        # Add mines randomly - random.sample draws unique flat indices in
+        # O(mines) time, however close mines is to the size of the board
+        flat_idx = random.sample(range(height * width), mines)
+        self.board.flat[flat_idx] = True
+        self.mines = {divmod(f, width) for f in flat_idx}
+
+        # The board never changes after this point, so compute every cell's
+        # neighbour-mine count up front in one compiled pass
+        self._counts = _count_all_neighbors(self.board)
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -40,19 +126,19 @@ class Minesweeper():
         Prints a text-based representation
         of where mines are located.
         """
+        # Build the whole board as one string and write it in one go,
+        # instead of a print call (and potential flush) per cell
+        sep = "--" * self.width + "-"
+        rows = []
         for i in range(self.height):
-            print("--" * self.width + "-")
-            for j in range(self.width):
-                if self.board[i][j]:
-                    print("|X", end="")
-                else:
-                    print("| ", end="")
-            print("|")
-        print("--" * self.width + "-")
+            rows.append(sep)
+            rows.append("".join("|X" if self.board[i, j] else "| "
+                                for j in range(self.width)) + "|")
+        rows.append(sep)
+        sys.stdout.write("\n".join(rows) + "\n")
 
     def is_mine(self, cell):
-        i, j = cell
-        return self.board[i][j]
+        return bool(self.board[cell])
 
     def nearby_mines(self, cell):
         """
@@ -60,24 +146,7 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
-
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        return int(self._counts[cell])
 
     def won(self):
         """
@@ -86,64 +155,82 @@ class Minesweeper():
         return self.mines_found == self.mines
 
 
+def _iter_bits(mask):
+    """
+    Yields the positions of the set bits in a mask, lowest first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask &= mask - 1
+
+
 class Sentence():
     """
     Logical statement about a Minesweeper game
-    A sentence consists of a set of board cells,
-    and a count of the number of those cells which are mines.
+    A sentence consists of a bitmask of board cells (cell (i, j) is the
+    bit i * width + j), and a count of the number of those cells which
+    are mines. A single integer operation replaces every set operation,
+    since the whole board fits in one Python int.
     """
 
     def __init__(self, cells, count):
-        self.cells = set(cells)
+        self.cells = cells
         self.count = count
 
+        # Cleared when the sentence is emptied or deduplicated, so stale
+        # worklist and index references can skip it without list removals
+        self.alive = True
+
     def __eq__(self, other):
         return self.cells == other.cells and self.count == other.count
 
+    def __hash__(self):
+        return hash((self.cells, self.count))
+
     def __str__(self):
-        return f"{self.cells} = {self.count}"
+        return f"{set(_iter_bits(self.cells))} = {self.count}"
 
     def known_mines(self):
         """
-        Returns the set of all cells in self.cells known to be mines.
+        Returns the bitmask of cells in self.cells known to be mines.
         """
         # If cells number is the same as the count then definitely a mine there
         # We don't want count to be 0, since cannot have 0 cells around another cell
-        if len(self.cells) == self.count and self.count != 0:
+        if self.cells.bit_count() == self.count != 0:
             return self.cells
-        # Otherwise return the empty set
-        else: return set()
-                
+        # Otherwise return the empty mask
+        return 0
 
     def known_safes(self):
         """
-        Returns the set of all cells in self.cells known to be safe.
+        Returns the bitmask of cells in self.cells known to be safe.
         """
         # We only really know if its safe when the count is == 0
         if self.count == 0:
             return self.cells
-        return set()
+        return 0
 
-    def mark_mine(self, cell):
+    def mark_mine(self, cell_bit):
         """
         Updates internal knowledge representation given the fact that
         a cell is known to be a mine.
         """
         # Check to see if cell is in the sentence
-        if cell in self.cells:
+        if self.cells & cell_bit:
             # Then update the sentence, to remove cell from sentence
-            self.cells.remove(cell)
-            self.count -=1
+            self.cells &= ~cell_bit
+            self.count -= 1
         # Otherwise do nothing
 
-    def mark_safe(self, cell):
+    def mark_safe(self, cell_bit):
         """
         Updates internal knowledge representation given the fact that
         a cell is known to be safe.
         """
         # Check if cell in sentence
-        if cell in self.cells:
-            self.cells.remove(cell)
+        if self.cells & cell_bit:
+            self.cells &= ~cell_bit
         # We don't need to update the count in this case since our knowledge of mines hasn't changed
 
 
@@ -165,35 +252,166 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
+        # Bitmask mirrors of the three sets above, so move selection
+        # can be answered with single integer operations
+        self.moves_made_mask = 0
+        self.mines_mask = 0
+        self.safes_mask = 0
+
+        # List of sentences about the game known to be true, plus a set of
+        # their (cells, count) keys so duplicate sentences are rejected in
+        # O(1) instead of being compared against quadratically later
         self.knowledge = []
+        self._knowledge_index = set()
+
+        # Inverted index from a single-bit cell mask to the sentences that
+        # mention that cell, so marking a cell only touches those sentences.
+        # Once a cell is marked no sentence can ever mention it again, so
+        # each mark simply pops the whole bucket
+        self._cell_index = {}
+
+        # Cells that can never be a random move: already played or a known mine
+        self._forbidden = np.zeros((height, width), dtype=np.bool_)
+
+        # Precompute each cell's neighbourhood as a bitmask once, since the
+        # neighbours of a cell never change for the whole game
+        self._neighbors_mask = []
+        for i in range(height):
+            for j in range(width):
+                mask = 0
+                for di in (-1, 0, 1):
+                    for dj in (-1, 0, 1):
+                        if (di or dj) and 0 <= i + di < height and 0 <= j + dj < width:
+                            mask |= 1 << ((i + di) * width + (j + dj))
+                self._neighbors_mask.append(mask)
+
+    def _cell_bit(self, cell):
+        """
+        Returns the single-bit mask for a board cell.
+        """
+        return 1 << (cell[0] * self.width + cell[1])
+
+    def _mask_cells(self, mask):
+        """
+        Converts a bitmask back to a set of (i, j) cells.
+        """
+        return {divmod(b, self.width) for b in _iter_bits(mask)}
         
     # Update the knowledge base when we recieve new information
     def knowledge_update(self):
+
+        # A default 8x8 board's cells fit in one 64-bit word, so the whole
+        # pairwise reduction can run as compiled code over uint64 arrays
+        words = self.height * self.width <= 64
+
+        # Start with every sentence on the worklist; later rounds only
+        # requeue the sentences that marking a mine or safe contracted
+        queue = deque(self.knowledge)
         while True:
-            breaker = True
-            
-            # Check sentences in knowledge 
-            for i in self.knowledge:
-                for j in self.knowledge:
-                    
-                    # Check they're not 0 first 
-                    if len(i.cells) != 0 and len(j.cells) != 0:
-                        
-                        # Gives the difference between the cells and counts to reduce subset of information
-                        if i.cells < j.cells:
-                            j.cells -= i.cells
-                            j.count -= i.count
-                            breaker = False
-                    # If at least one is 0
-                    else:
-                        if i in self.knowledge and len(i.cells) == 0:
-                            self.knowledge.remove(i)
-                        if j in self.knowledge and len(j.cells) == 0:
-                            self.knowledge.remove(j)                    
-            if breaker:
+            if words:
+                self._reduce_subsets_words()
+            else:
+                self._reduce_subsets(queue)
+
+            # Harvest every cell the reduced sentences now pin down
+            new_mines = 0
+            new_safes = 0
+            for sentence in self.knowledge:
+                new_mines |= sentence.known_mines()
+                new_safes |= sentence.known_safes()
+            new_mines &= ~self.mines_mask
+            new_safes &= ~self.safes_mask
+            if not (new_mines | new_safes):
                 break
 
+            # Feed the discoveries back through mark_mine/mark_safe, which
+            # contract the sentences again - so requeue the ones they touch
+            # and go round for another reduction pass
+            touched = new_mines | new_safes
+            queue = deque(s for s in self.knowledge if s.alive and s.cells & touched)
+            for mine in self._mask_cells(new_mines):
+                self.mark_mine(mine)
+            for safe in self._mask_cells(new_safes):
+                self.mark_safe(safe)
+
+    # Run the subset-subtract worklist until no sentence changes
+    def _reduce_subsets(self, queue):
+
+        # A single sentence has nothing to be reduced against
+        if len(self.knowledge) < 2:
+            self._sweep_knowledge()
+            return
+
+        # Index each cell bit to the sentences mentioning it, so a sentence
+        # only gets compared against the sentences it can actually overlap
+        # with (cells only ever shrink, so stale entries are harmless no-ops)
+        index = {}
+        for sentence in self.knowledge:
+            for b in _iter_bits(sentence.cells):
+                index.setdefault(b, []).append(sentence)
+
+        while queue:
+            i = queue.popleft()
+            if not i.alive or i.cells == 0:
+                continue
+
+            # Collect the sentences sharing at least one cell with i
+            # (keyed by id since sentences are mutable)
+            sharing = {}
+            for b in _iter_bits(i.cells):
+                for sentence in index.get(b, ()):
+                    sharing[id(sentence)] = sentence
+
+            i_size = i.cells.bit_count()
+            for j in sharing.values():
+                if j is i or not j.alive or j.cells == 0:
+                    continue
+
+                # i can only be a strict subset of a strictly larger j, so a
+                # popcount compare rules most pairs out before the mask test
+                if j.cells.bit_count() <= i_size:
+                    continue
+
+                # Strict subset is now just one AND plus an equality test;
+                # reduce j by the difference between the cells and counts
+                if i.cells & j.cells == i.cells:
+                    self._knowledge_index.discard((j.cells, j.count))
+                    j.cells &= ~i.cells
+                    j.count -= i.count
+                    self._knowledge_index.add((j.cells, j.count))
+
+                    # j just shrank, so wake it up for another look
+                    queue.append(j)
+
+        self._sweep_knowledge()
+
+    # For boards whose cells fit in one 64-bit word, pack the sentences
+    # into uint64 arrays and let the compiled loop do the reductions
+    def _reduce_subsets_words(self):
+        if len(self.knowledge) > 1:
+            cells = np.array([s.cells for s in self.knowledge], dtype=np.uint64)
+            counts = np.array([s.count for s in self.knowledge], dtype=np.int64)
+            _propagate_words(cells, counts)
+            for s, c, n in zip(self.knowledge, cells, counts):
+                s.cells = int(c)
+                s.count = int(n)
+        self._sweep_knowledge()
+
+    def _sweep_knowledge(self):
+        # Sweep out dead or emptied sentences and any duplicates the
+        # reductions produced, rebuilding the key index as we go; marking
+        # the casualties dead lets lingering queue entries skip them
+        self._knowledge_index = set()
+        kept = []
+        for s in self.knowledge:
+            key = (s.cells, s.count)
+            if s.alive and s.cells and key not in self._knowledge_index:
+                self._knowledge_index.add(key)
+                kept.append(s)
+            else:
+                s.alive = False
+        self.knowledge = kept
+
 
     def mark_mine(self, cell):
         """
@@ -201,8 +419,21 @@ class MinesweeperAI():
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self._forbidden[cell] = True
+        cell_bit = self._cell_bit(cell)
+        self.mines_mask |= cell_bit
+        for sentence in self._cell_index.pop(cell_bit, ()):
+            # Swept-out duplicates linger in their buckets; mutating them
+            # would push phantom keys into the knowledge index
+            if not sentence.alive:
+                continue
+            if sentence.cells & cell_bit:
+                self._knowledge_index.discard((sentence.cells, sentence.count))
+                sentence.mark_mine(cell_bit)
+                if sentence.cells:
+                    self._knowledge_index.add((sentence.cells, sentence.count))
+                else:
+                    sentence.alive = False
 
     def mark_safe(self, cell):
         """
@@ -210,38 +441,57 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        cell_bit = self._cell_bit(cell)
+        self.safes_mask |= cell_bit
+        for sentence in self._cell_index.pop(cell_bit, ()):
+            # Swept-out duplicates linger in their buckets; mutating them
+            # would push phantom keys into the knowledge index
+            if not sentence.alive:
+                continue
+            if sentence.cells & cell_bit:
+                self._knowledge_index.discard((sentence.cells, sentence.count))
+                sentence.mark_safe(cell_bit)
+                if sentence.cells:
+                    self._knowledge_index.add((sentence.cells, sentence.count))
+                else:
+                    sentence.alive = False
 
     def add_knowledge(self, cell, count):
         
-        # Add the moves that have been made 
+        # Add the moves that have been made
         self.moves_made.add(cell)
+        self.moves_made_mask |= self._cell_bit(cell)
+        self._forbidden[cell] = True
         
         # Then we want to mark that cell as a safe cell
         self.mark_safe(cell)
 
-        # Define the cells that are nearby: ± one row or column 
-        nearby_cells = set()
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                
-                # Check i falls within the actual board - height and width
-                if 0 <= i < self.height and 0 <= j < self.width and (i, j) != cell:
-                    # Then just add the cells to the nearby set
-                    nearby_cells.add((i, j))  
-                          
-        # Define nearby cells that we don't yet know
-        nearby_unknown = nearby_cells - self.moves_made - self.mines - self.safes
-        nearby_unknown_count = count - len(nearby_cells & self.mines)
-        
-        if len(nearby_unknown) > 0: 
-            self.knowledge.append(Sentence(nearby_unknown, nearby_unknown_count))    
-            self.knowledge_update()      
+        # Look up the precomputed mask of cells that are nearby: ± one row or column
+        nearby = self._neighbors_mask[cell[0] * self.width + cell[1]]
 
-        for sentence in self.knowledge:
-            self.safes |= sentence.known_safes()
-            self.mines |= sentence.known_mines()
+        # Define nearby cells that we don't yet know
+        nearby_unknown = nearby & ~self.moves_made_mask & ~self.mines_mask & ~self.safes_mask
+        nearby_unknown_count = count - (nearby & self.mines_mask).bit_count()
+
+        if nearby_unknown:
+            key = (nearby_unknown, nearby_unknown_count)
+            if key not in self._knowledge_index:
+                self._knowledge_index.add(key)
+                sentence = Sentence(nearby_unknown, nearby_unknown_count)
+                self.knowledge.append(sentence)
+
+                # Register the new sentence under each of its cells (cells
+                # only shrink afterwards, so entries can go stale but a
+                # sentence is never missing from a bucket it belongs in)
+                mask = nearby_unknown
+                while mask:
+                    low = mask & -mask
+                    self._cell_index.setdefault(low, []).append(sentence)
+                    mask &= mask - 1
+
+        # Run inference to a fixpoint - even with no new sentence, the
+        # mark_safe above may have contracted existing ones
+        self.knowledge_update()
         
     def make_safe_move(self):
         """
@@ -252,12 +502,12 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        # Check if move hasn't been made already
-        for move in self.safes:
-            # Can't have already been made and must be a safe move
-            if move not in self.moves_made and move in self.safes:
-                return move   
-        return None
+        # The unplayed safes are one int op away: safe and not yet made
+        unplayed = self.safes_mask & ~self.moves_made_mask
+        if not unplayed:
+            return None
+        # Take the lowest set bit
+        return divmod((unplayed & -unplayed).bit_length() - 1, self.width)
                 
 
     def make_random_move(self):
@@ -267,18 +517,14 @@ class MinesweeperAI():
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        # Call this function is make_safe_move isn't possible
-        # Lets first create an array of the moves from which we can randomly select
-        potential_moves = []
-        # Check cell hasn;t been picked yet and we know isn't a mine
-        for i in range(self.height):
-            for j in range(self.width):
-                if (i,j) not in self.moves_made and (i,j) not in self.mines:
-                    potential_moves.append((i,j))
-        # If we have some moves stored in potential_moves, then we can choose a random one
-        if len(potential_moves) != 0:
-            return random.choice(potential_moves)
-        else: return None
+        # Call this function if make_safe_move isn't possible
+        # The forbidden mask already tracks played cells and known mines,
+        # so the candidates come from one vectorised scan rather than a double loop
+        idx = np.flatnonzero(~self._forbidden.ravel())
+        if idx.size == 0:
+            return None
+        pick = int(idx[random.randrange(idx.size)])
+        return divmod(pick, self.width)
                     
 
     
\ No newline at end of file